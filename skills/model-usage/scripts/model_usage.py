@@ -148,8 +148,8 @@ def pick_current_model(entries: List[Dict[str, Any]]) -> Tuple[Optional[str], Op
                 if isinstance(model, str) and isinstance(cost, (int, float)):
                     scored.append(ModelCost(model=model, cost=float(cost)))
             if scored:
-                scored.sort(key=lambda item: item.cost, reverse=True)
-                return scored[0].model, entry.get("date") if isinstance(entry.get("date"), str) else None
+                top = max(scored, key=lambda item: item.cost)
+                return top.model, entry.get("date") if isinstance(entry.get("date"), str) else None
         models_used = entry.get("modelsUsed")
         if isinstance(models_used, list) and models_used:
             last = models_used[-1]
@@ -7,7 +7,7 @@ import argparse
 from datetime import date, timedelta
 from unittest import TestCase, main
 
-from model_usage import filter_by_days, positive_int
+from model_usage import filter_by_days, pick_current_model, positive_int
 
 
 class TestModelUsage(TestCase):
@@ -35,6 +35,21 @@ class TestModelUsage(TestCase):
         self.assertEqual(filtered[0]["date"], (today - timedelta(days=1)).strftime("%Y-%m-%d"))
         self.assertEqual(filtered[1]["date"], today.strftime("%Y-%m-%d"))
 
+    def test_pick_current_model_prefers_highest_cost_on_latest_day(self):
+        entries = [
+            {"date": "2025-01-01", "modelBreakdowns": [{"modelName": "old", "cost": 9.0}]},
+            {
+                "date": "2025-01-02",
+                "modelBreakdowns": [
+                    {"modelName": "first", "cost": 2.0},
+                    {"modelName": "cheap", "cost": 1.0},
+                    {"modelName": "tied", "cost": 2.0},
+                ],
+            },
+        ]
+
+        self.assertEqual(pick_current_model(entries), ("first", "2025-01-02"))
+
 
 if __name__ == "__main__":
     main()
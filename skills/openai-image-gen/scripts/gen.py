@@ -3,21 +3,28 @@ import argparse
 import base64
 import datetime as dt
 import json
+import math
 import os
 import random
 import re
 import sys
+import time
 import urllib.error
 import urllib.request
 from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from html import escape as html_escape
+from itertools import islice
 from pathlib import Path
 
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 60.0
+
 
 def slugify(text: str) -> str:
     text = text.lower().strip()
-    text = re.sub(r"[^a-z0-9]+", "-", text)
-    text = re.sub(r"-{2,}", "-", text).strip("-")
+    text = re.sub(r"[^a-z0-9]+", "-", text).strip("-")  # also collapses "--"
     return text or "image"
 
 
@@ -154,6 +161,18 @@ def normalize_output_format(model: str, output_format: str) -> str:
     )
 
 
+def retry_delay(headers, attempt: int) -> float:
+    """Honor a numeric Retry-After header, else back off exponentially."""
+    retry_after = (headers or {}).get("Retry-After", "")
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = math.nan
+    if not math.isfinite(delay):
+        delay = RETRY_BASE_DELAY * (2**attempt)
+    return min(max(delay, 0.0), RETRY_MAX_DELAY)
+
+
 def request_images(
     api_key: str,
     prompt: str,
@@ -163,6 +182,7 @@ def request_images(
     background: str = "",
     output_format: str = "",
     style: str = "",
+    max_retries: int = 3,
 ) -> dict:
     url = "https://api.openai.com/v1/images/generations"
     args = {
@@ -198,12 +218,50 @@ def request_images(
         },
         data=body,
     )
+    attempt = 0
+    while True:
+        try:
+            with urllib.request.urlopen(req, timeout=300) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            payload = e.read().decode("utf-8", errors="replace")
+            # 429 is also used for exhausted billing quota, which retrying cannot fix.
+            quota_exhausted = e.code == 429 and "insufficient_quota" in payload
+            if e.code not in RETRYABLE_STATUS or quota_exhausted or attempt >= max_retries:
+                raise RuntimeError(f"OpenAI Images API failed ({e.code}): {payload}") from e
+            delay = retry_delay(e.headers, attempt)
+            print(f"OpenAI Images API returned {e.code}; retrying in {delay:.1f}s", file=sys.stderr)
+            time.sleep(delay)
+            attempt += 1
+
+
+def map_bounded(func: Callable, jobs: list[tuple], concurrency: int) -> list:
+    """Call func(*job) for each job, keeping input order in the results.
+
+    At most `concurrency` calls are in flight, and nothing new is dispatched
+    once a call fails (or on Ctrl-C). Calls already in flight are waited for
+    before the first error is re-raised, so their side effects are complete
+    when this returns. concurrency=1 runs jobs serially on the calling thread.
+    """
+    if concurrency <= 1:
+        return [func(*job) for job in jobs]
+
+    results: list = [None] * len(jobs)
+    pending = {}
+    queued = iter(enumerate(jobs))
+    pool = ThreadPoolExecutor(max_workers=concurrency)
     try:
-        with urllib.request.urlopen(req, timeout=300) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        payload = e.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"OpenAI Images API failed ({e.code}): {payload}") from e
+        for idx, job in islice(queued, concurrency):
+            pending[pool.submit(func, *job)] = idx
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+            for idx, job in islice(queued, len(done)):
+                pending[pool.submit(func, *job)] = idx
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results
 
 
 def write_gallery(out_dir: Path, items: list[dict]) -> None:
@@ -251,6 +309,7 @@ def main() -> int:
     ap.add_argument("--output-format", default="", help="Output format (GPT models only): png, jpeg, or webp.")
     ap.add_argument("--style", default="", help="Image style (dall-e-3 only): vivid or natural.")
     ap.add_argument("--out-dir", default="", help="Output directory (default: ./tmp/openai-image-gen-<ts>).")
+    ap.add_argument("--concurrency", type=int, default=1, help="Max parallel API requests (default: 1).")
     args = ap.parse_args()
 
     api_key = (os.environ.get("OPENAI_API_KEY") or "").strip()
@@ -263,6 +322,10 @@ def main() -> int:
     size = args.size or default_size
     quality = args.quality or default_quality
 
+    if args.concurrency < 1:
+        print("--concurrency must be >= 1", file=sys.stderr)
+        return 2
+
     count = args.count
     if args.model == "dall-e-3" and count > 1:
         print(f"Warning: dall-e-3 only supports generating 1 image at a time. Reducing count from {count} to 1.", file=sys.stderr)
@@ -287,8 +350,14 @@ def main() -> int:
     else:
         file_ext = "png"
 
-    items: list[dict] = []
-    for idx, prompt in enumerate(prompts, start=1):
+    finished: dict[int, dict] = {}
+
+    def write_outputs() -> None:
+        items = [finished[idx] for idx in sorted(finished)]
+        (out_dir / "prompts.json").write_text(json.dumps(items, indent=2), encoding="utf-8")
+        write_gallery(out_dir, items)
+
+    def generate(idx: int, prompt: str) -> dict:
         print(f"[{idx}/{len(prompts)}] {prompt}")
         res = request_images(
             api_key,
@@ -316,10 +385,20 @@ def main() -> int:
             except urllib.error.URLError as e:
                 raise RuntimeError(f"Failed to download image from {image_url}: {e}") from e
 
-        items.append({"prompt": prompt, "file": filename})
+        item = {"prompt": prompt, "file": filename}
+        finished[idx] = item
+        return item
 
-    (out_dir / "prompts.json").write_text(json.dumps(items, indent=2), encoding="utf-8")
-    write_gallery(out_dir, items)
+    try:
+        map_bounded(generate, list(enumerate(prompts, start=1)), args.concurrency)
+    except BaseException:
+        # Record images that did finish so none are left in out_dir unlisted.
+        if finished:
+            write_outputs()
+            print(f"Wrote partial results: {(out_dir / 'index.html').as_posix()}", file=sys.stderr)
+        raise
+
+    write_outputs()
     print(f"\nWrote: {(out_dir / 'index.html').as_posix()}")
     return 0
 
@@ -1,17 +1,33 @@
 """Tests for openai-image-gen helpers."""
 
+import json
+import sys
 import tempfile
+import threading
+import time
+import urllib.error
+from io import BytesIO
 from pathlib import Path
 
+import gen
 import pytest
 from gen import (
+    map_bounded,
     normalize_background,
     normalize_output_format,
     normalize_style,
+    request_images,
+    retry_delay,
+    slugify,
     write_gallery,
 )
 
 
+def test_slugify_collapses_separator_runs():
+    assert slugify("  A -- lobster, astronaut!  ") == "a-lobster-astronaut"
+    assert slugify("***") == "image"
+
+
 def test_normalize_background_allows_empty_for_non_gpt_models():
     assert normalize_background("dall-e-3", "transparent") == ""
 
@@ -138,3 +154,235 @@ def test_write_gallery_normal_output():
         assert "a lobster astronaut, golden hour" in html
         assert 'src="001-lobster.png"' in html
         assert "002-nook.png" in html
+
+
+def test_main_concurrency_keeps_prompt_order(monkeypatch):
+    def fake_request_images(_api_key, prompt, *_args):
+        return {"data": [{"b64_json": "aGVsbG8="}]}
+
+    monkeypatch.setattr(gen, "request_images", fake_request_images)
+    monkeypatch.setattr(gen, "pick_prompts", lambda count: [f"prompt {i}" for i in range(count)])
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setattr(
+            sys, "argv", ["gen.py", "--count", "5", "--concurrency", "3", "--out-dir", tmpdir]
+        )
+        assert gen.main() == 0
+        items = json.loads((Path(tmpdir) / "prompts.json").read_text())
+        assert [it["prompt"] for it in items] == [f"prompt {i}" for i in range(5)]
+        assert items[0]["file"] == "001-prompt-0.png"
+        assert (Path(tmpdir) / items[4]["file"]).read_bytes() == b"hello"
+
+
+def test_main_rejects_non_positive_concurrency(monkeypatch, capsys):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(sys, "argv", ["gen.py", "--concurrency", "0"])
+    assert gen.main() == 2
+    assert "--concurrency must be >= 1" in capsys.readouterr().err
+
+
+class FakeResponse(BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+
+def http_error(code: int, headers=None, body: bytes = b"busy") -> urllib.error.HTTPError:
+    return urllib.error.HTTPError(
+        "https://api.openai.com/v1/images/generations",
+        code,
+        "error",
+        headers or {},
+        BytesIO(body),
+    )
+
+
+def test_request_images_retries_retryable_status(monkeypatch):
+    responses = [http_error(429), http_error(503), FakeResponse(b'{"data": []}')]
+    sleeps = []
+
+    def fake_urlopen(_req, timeout):
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(gen.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(gen.time, "sleep", sleeps.append)
+
+    assert request_images("key", "prompt", "gpt-image-1", "1024x1024", "high") == {"data": []}
+    assert sleeps == [2.0, 4.0]
+
+
+def test_request_images_does_not_retry_client_errors(monkeypatch):
+    calls = []
+
+    def fake_urlopen(_req, timeout):
+        calls.append(1)
+        raise http_error(400)
+
+    monkeypatch.setattr(gen.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(gen.time, "sleep", lambda _delay: None)
+
+    with pytest.raises(RuntimeError, match=r"failed \(400\): busy"):
+        request_images("key", "prompt", "gpt-image-1", "1024x1024", "high")
+    assert len(calls) == 1
+
+
+def test_request_images_does_not_retry_insufficient_quota(monkeypatch):
+    calls = []
+    body = b'{"error": {"code": "insufficient_quota", "type": "insufficient_quota"}}'
+
+    def fake_urlopen(_req, timeout):
+        calls.append(1)
+        raise http_error(429, body=body)
+
+    monkeypatch.setattr(gen.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(gen.time, "sleep", lambda _delay: pytest.fail("should not sleep"))
+
+    with pytest.raises(RuntimeError, match=r"failed \(429\).*insufficient_quota"):
+        request_images("key", "prompt", "gpt-image-1", "1024x1024", "high")
+    assert len(calls) == 1
+
+
+def test_request_images_gives_up_after_max_retries(monkeypatch):
+    def fake_urlopen(_req, timeout):
+        raise http_error(500)
+
+    monkeypatch.setattr(gen.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(gen.time, "sleep", lambda _delay: None)
+
+    with pytest.raises(RuntimeError, match=r"failed \(500\)"):
+        request_images("key", "prompt", "gpt-image-1", "1024x1024", "high", max_retries=1)
+
+
+def test_retry_delay_prefers_retry_after_header():
+    assert retry_delay({"Retry-After": "7"}, attempt=0) == 7.0
+    assert retry_delay({"Retry-After": "3600"}, attempt=0) == 60.0
+
+
+def test_retry_delay_falls_back_to_exponential_backoff():
+    assert retry_delay({}, attempt=0) == 2.0
+    assert retry_delay({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, attempt=2) == 8.0
+    assert retry_delay(None, attempt=1) == 4.0
+
+
+def test_retry_delay_ignores_non_finite_retry_after():
+    assert retry_delay({"Retry-After": "nan"}, attempt=0) == 2.0
+    assert retry_delay({"Retry-After": "inf"}, attempt=1) == 4.0
+    assert retry_delay({"Retry-After": "-inf"}, attempt=2) == 8.0
+
+
+def test_request_images_reports_sub_second_delay(monkeypatch, capsys):
+    responses = [http_error(429, {"Retry-After": "0.5"}), FakeResponse(b"{}")]
+
+    def fake_urlopen(_req, timeout):
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(gen.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(gen.time, "sleep", lambda _delay: None)
+
+    assert request_images("key", "prompt", "gpt-image-1", "1024x1024", "high") == {}
+    assert "retrying in 0.5s" in capsys.readouterr().err
+
+
+def test_map_bounded_serial_stops_at_first_failure():
+    calls = []
+
+    def job(idx):
+        calls.append(idx)
+        if idx == 0:
+            raise RuntimeError("boom")
+        return idx
+
+    with pytest.raises(RuntimeError, match="boom"):
+        map_bounded(job, [(i,) for i in range(10)], 1)
+    assert calls == [0]
+
+
+def test_map_bounded_parallel_stops_dispatching_after_failure(monkeypatch):
+    calls = []
+    started = threading.Barrier(3)
+    release = threading.Event()
+
+    def job(idx):
+        calls.append(idx)
+        started.wait()
+        if idx == 0:
+            raise RuntimeError("boom")
+        release.wait()
+        return idx
+
+    real_wait = gen.wait
+
+    def wait_then_release(futures, return_when):
+        done, not_done = real_wait(futures, return_when=return_when)
+        # Let jobs 1-2 finish only once the failure has been observed.
+        if any(future.exception() for future in done):
+            release.set()
+        return done, not_done
+
+    monkeypatch.setattr(gen, "wait", wait_then_release)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        map_bounded(job, [(i,) for i in range(10)], 3)
+    assert sorted(calls) == [0, 1, 2]
+
+
+def test_map_bounded_parallel_keeps_input_order():
+    def job(idx):
+        time.sleep(0.01 * (5 - idx))
+        return idx
+
+    assert map_bounded(job, [(i,) for i in range(5)], 3) == [0, 1, 2, 3, 4]
+
+
+def test_main_failed_request_stops_later_prompts(monkeypatch):
+    calls = []
+
+    def fake_request_images(_api_key, prompt, *_args):
+        calls.append(prompt)
+        raise RuntimeError("OpenAI Images API failed (400): bad prompt")
+
+    monkeypatch.setattr(gen, "request_images", fake_request_images)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setattr(
+            sys, "argv", ["gen.py", "--prompt", "a lobster", "--count", "10", "--out-dir", tmpdir]
+        )
+        with pytest.raises(RuntimeError, match="bad prompt"):
+            gen.main()
+        assert calls == ["a lobster"]
+        assert list(Path(tmpdir).iterdir()) == []
+
+
+def test_main_parallel_failure_records_finished_images(monkeypatch):
+    started = threading.Barrier(3)
+
+    def fake_request_images(_api_key, prompt, *_args):
+        if prompt in ("prompt 0", "prompt 1", "prompt 2"):
+            started.wait()
+        if prompt == "prompt 0":
+            raise RuntimeError("OpenAI Images API failed (400): bad prompt")
+        return {"data": [{"b64_json": "aGVsbG8="}]}
+
+    monkeypatch.setattr(gen, "request_images", fake_request_images)
+    monkeypatch.setattr(gen, "pick_prompts", lambda count: [f"prompt {i}" for i in range(count)])
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setattr(
+            sys, "argv", ["gen.py", "--count", "6", "--concurrency", "3", "--out-dir", tmpdir]
+        )
+        with pytest.raises(RuntimeError, match="bad prompt"):
+            gen.main()
+        out = Path(tmpdir)
+        recorded = {it["file"] for it in json.loads((out / "prompts.json").read_text())}
+        images = {path.name for path in out.glob("*.png")}
+        assert {"002-prompt-1.png", "003-prompt-2.png"} <= recorded
+        assert images == recorded
+        assert (out / "index.html").exists()
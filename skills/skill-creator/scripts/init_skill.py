@@ -195,9 +195,7 @@ def normalize_skill_name(skill_name):
     """Normalize a skill name to lowercase hyphen-case."""
     normalized = skill_name.strip().lower()
     normalized = re.sub(r"[^a-z0-9]+", "-", normalized)
-    normalized = normalized.strip("-")
-    normalized = re.sub(r"-{2,}", "-", normalized)
-    return normalized
+    return normalized.strip("-")
 
 
 def title_case_skill_name(skill_name):
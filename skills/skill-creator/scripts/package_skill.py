@@ -10,12 +10,15 @@ Example:
     python utils/package_skill.py skills/public/my-skill ./dist
 """
 
+import os
 import sys
 import zipfile
 from pathlib import Path
 
 from quick_validate import validate_skill
 
+EXCLUDED_DIRS = {".git", ".svn", ".hg", "__pycache__", "node_modules"}
+
 
 def _is_within(path: Path, root: Path) -> bool:
     try:
@@ -25,6 +28,34 @@ def _is_within(path: Path, root: Path) -> bool:
         return False
 
 
+def _iter_skill_files(directory: Path):
+    """
+    Yield regular files under directory in sorted order.
+
+    Entries named in EXCLUDED_DIRS are skipped whatever their type, so those
+    directories are never walked. Symlinks are never followed or packaged,
+    and unreadable directories are skipped with a warning.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except PermissionError:
+        print(f"[WARN] Skipping unreadable directory: {directory}")
+        return
+    for entry in entries:
+        path = Path(entry.path)
+        # Also covers a `.git` gitfile in submodules and worktrees.
+        if entry.name in EXCLUDED_DIRS:
+            continue
+        if entry.is_symlink():
+            print(f"[WARN] Skipping symlink: {path}")
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_skill_files(path)
+        elif entry.is_file(follow_symlinks=False):
+            yield path
+
+
 def package_skill(skill_path, output_dir=None):
     """
     Package a skill folder into a .skill file.
@@ -72,36 +103,24 @@ def package_skill(skill_path, output_dir=None):
 
     skill_filename = output_path / f"{skill_name}.skill"
 
-    EXCLUDED_DIRS = {".git", ".svn", ".hg", "__pycache__", "node_modules"}
-
     # Create the .skill file (zip format)
     try:
         with zipfile.ZipFile(skill_filename, "w", zipfile.ZIP_DEFLATED) as zipf:
             # Walk through the skill directory
-            for file_path in skill_path.rglob("*"):
-                # Security: never follow or package symlinks.
-                if file_path.is_symlink():
-                    print(f"[WARN] Skipping symlink: {file_path}")
-                    continue
-
-                rel_parts = file_path.relative_to(skill_path).parts
-                if any(part in EXCLUDED_DIRS for part in rel_parts):
+            for file_path in _iter_skill_files(skill_path):
+                resolved_file = file_path.resolve()
+                if not _is_within(resolved_file, skill_path):
+                    print(f"[ERROR] File escapes skill root: {file_path}")
+                    return None
+                # If output lives under skill_path, avoid writing archive into itself.
+                if resolved_file == skill_filename.resolve():
+                    print(f"[WARN] Skipping output archive: {file_path}")
                     continue
 
-                if file_path.is_file():
-                    resolved_file = file_path.resolve()
-                    if not _is_within(resolved_file, skill_path):
-                        print(f"[ERROR] File escapes skill root: {file_path}")
-                        return None
-                    # If output lives under skill_path, avoid writing archive into itself.
-                    if resolved_file == skill_filename.resolve():
-                        print(f"[WARN] Skipping output archive: {file_path}")
-                        continue
-
-                    # Calculate the relative path within the zip.
-                    arcname = Path(skill_name) / file_path.relative_to(skill_path)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
+                # Calculate the relative path within the zip.
+                arcname = Path(skill_name) / file_path.relative_to(skill_path)
+                zipf.write(file_path, arcname)
+                print(f"  Added: {arcname}")
 
         print(f"\n[OK] Successfully packaged skill to: {skill_filename}")
         return skill_filename
@@ -155,6 +155,66 @@ class TestPackageSkillSecurity(TestCase):
         self.assertIn("self-output-skill/script.py", names)
         self.assertNotIn("self-output-skill/self-output-skill.skill", names)
 
+    def test_prunes_excluded_directories(self):
+        skill_dir = self.create_skill("excluded-skill")
+        for excluded in ("node_modules/pkg", ".git", "lib/__pycache__"):
+            nested = skill_dir / excluded
+            nested.mkdir(parents=True, exist_ok=True)
+            (nested / "ignored.txt").write_text("ignored\n")
+        (skill_dir / "lib" / "keep.py").write_text("x = 1\n")
+        out_dir = self.temp_dir / "out"
+        out_dir.mkdir()
+
+        result = package_skill(str(skill_dir), str(out_dir))
+
+        self.assertIsNotNone(result)
+        with zipfile.ZipFile(out_dir / "excluded-skill.skill", "r") as archive:
+            names = set(archive.namelist())
+        self.assertEqual(
+            names,
+            {
+                "excluded-skill/SKILL.md",
+                "excluded-skill/script.py",
+                "excluded-skill/lib/keep.py",
+            },
+        )
+
+    def test_skips_excluded_names_that_are_files(self):
+        skill_dir = self.create_skill("gitfile-skill")
+        (skill_dir / ".git").write_text("gitdir: /home/me/repo/.git/modules/gitfile-skill\n")
+        out_dir = self.temp_dir / "out"
+        out_dir.mkdir()
+
+        result = package_skill(str(skill_dir), str(out_dir))
+
+        self.assertIsNotNone(result)
+        with zipfile.ZipFile(out_dir / "gitfile-skill.skill", "r") as archive:
+            names = set(archive.namelist())
+        self.assertEqual(names, {"gitfile-skill/SKILL.md", "gitfile-skill/script.py"})
+
+    def test_skips_unreadable_directory(self):
+        skill_dir = self.create_skill("unreadable-skill")
+        locked = skill_dir / "locked"
+        locked.mkdir()
+        (locked / "hidden.txt").write_text("hidden\n")
+        out_dir = self.temp_dir / "out"
+        out_dir.mkdir()
+
+        real_scandir = package_skill_module.os.scandir
+
+        def fake_scandir(path):
+            if Path(path).name == "locked":
+                raise PermissionError(13, "Permission denied", str(path))
+            return real_scandir(path)
+
+        with patch.object(package_skill_module.os, "scandir", fake_scandir):
+            result = package_skill(str(skill_dir), str(out_dir))
+
+        self.assertIsNotNone(result)
+        with zipfile.ZipFile(out_dir / "unreadable-skill.skill", "r") as archive:
+            names = set(archive.namelist())
+        self.assertEqual(names, {"unreadable-skill/SKILL.md", "unreadable-skill/script.py"})
+
 
 if __name__ == "__main__":
     main()